@@ -11,9 +11,17 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 # Heuristic GPU assignments for known large models.
 GPU_COUNTS: dict[str, int] = {
@@ -25,49 +33,91 @@ GPU_COUNTS: dict[str, int] = {
 }
 
 
+def _fsync_dir(path: Path) -> None:
+    # Persist the rename itself; not supported on every platform.
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(str(path), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
 def _atomic_write_json(path: Path, data: dict[str, Any]) -> None:
+    """Write `data` next to `path`, fsync it, then rename over `path`.
+
+    A crash can then never leave a truncated or empty `.log` behind.
+    """
+
     tmp_path = path.with_suffix(path.suffix + ".tmp")
-    tmp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-    tmp_path.replace(path)
+    if orjson is not None:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        with open(tmp_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+def _process_one(log_file: Path, *, default_num_gpus: int, verbose: bool) -> tuple[int, str | None]:
+    """Backfill `num_gpus` into one `.log` file.
+
+    Returns `(updated, message)`: `updated` is 1 if the file was rewritten, and `message` is
+    the status line to print (or None). Printing is left to the caller so output from the
+    worker threads stays in file order.
+    """
+
+    try:
+        raw = log_file.read_bytes()
+        if not raw.strip():
+            return 0, f"skip empty file: {log_file.name}" if verbose else None
+
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if not isinstance(data, dict):
+            return 0, f"skip non-object json: {log_file.name}" if verbose else None
+
+        if "num_gpus" in data:
+            return 0, None
+
+        # Extract model name (strip trailing "_en"/"_no" from stem).
+        stem = log_file.stem
+        i = stem.rfind("_")
+        model_base = stem[:i] if i != -1 else stem
+        num_gpus = GPU_COUNTS.get(model_base, default_num_gpus)
+        data["num_gpus"] = num_gpus
+
+        _atomic_write_json(log_file, data)
+
+        return 1, f"updated {log_file.name}: num_gpus={num_gpus}" if verbose or num_gpus > 1 else None
+    except Exception as exc:
+        return 0, f"error processing {log_file.name}: {exc}"
 
 
 def update_log_files(results_dir: Path, *, default_num_gpus: int = 1, verbose: bool = False) -> int:
     """Update `.log` files under `results_dir`.
 
+    Files are read, parsed and rewritten on a thread pool so the small reads overlap.
     Returns the number of files updated.
     """
 
+    # same matches as sorted(Path.glob("*.log")), without a Path per non-log entry
+    with os.scandir(results_dir) as it:
+        log_files = sorted(Path(entry.path) for entry in it if entry.name.endswith(".log"))
+    process = partial(_process_one, default_num_gpus=default_num_gpus, verbose=verbose)
     updated = 0
-    for log_file in sorted(results_dir.glob("*.log")):
-        try:
-            raw = log_file.read_text(encoding="utf-8")
-            if not raw.strip():
-                if verbose:
-                    print(f"skip empty file: {log_file.name}")
-                continue
-
-            data = json.loads(raw)
-            if not isinstance(data, dict):
-                if verbose:
-                    print(f"skip non-object json: {log_file.name}")
-                continue
-
-            if "num_gpus" in data:
-                continue
-
-            # Extract model name (strip trailing "_en"/"_no" from stem).
-            model_base = log_file.stem.rsplit("_", 1)[0]
-            num_gpus = int(GPU_COUNTS.get(model_base, default_num_gpus))
-            data["num_gpus"] = num_gpus
-
-            _atomic_write_json(log_file, data)
-            updated += 1
-
-            if verbose or num_gpus > 1:
-                print(f"updated {log_file.name}: num_gpus={num_gpus}")
-        except Exception as exc:
-            print(f"error processing {log_file.name}: {exc}")
-
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        # map yields results in submission order, so messages come out sorted by file
+        for n, message in executor.map(process, log_files):
+            updated += n
+            if message is not None:
+                print(message)
     return updated
 
 
@@ -12,9 +12,10 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
 from pathlib import Path
 
-from scipy.stats import chi2
+import numpy as np
 
 
 def build_argparser() -> argparse.ArgumentParser:
@@ -25,34 +26,37 @@ def build_argparser() -> argparse.ArgumentParser:
 
 
 def load_results(filepath: Path) -> list[dict]:
-    raw = json.loads(filepath.read_text(encoding="utf-8"))
+    raw = json.loads(filepath.read_bytes())
     if not isinstance(raw, list):
         raise ValueError(f"expected a list in {filepath}")
     return raw
 
 
+def _correct_mask(results: list[dict]) -> np.ndarray:
+    """Boolean array that is True where the item was graded `T`."""
+    return np.fromiter(
+        (str(q.get("grade", "")).strip().upper() == "T" for q in results), dtype=bool, count=len(results)
+    )
+
+
 def calculate_mcnemar_values(file1: Path, file2: Path) -> dict[str, int | str]:
     results1 = load_results(file1)
     results2 = load_results(file2)
     if len(results1) != len(results2):
         raise ValueError(f"result length mismatch: {len(results1)} vs {len(results2)}")
 
-    a = b = c = d = 0
-    for q1, q2 in zip(results1, results2):
-        if q1.get("question_num") != q2.get("question_num"):
-            raise ValueError("question_num mismatch; inputs are not aligned")
+    # object arrays: question_num may be null or a string, not just an int
+    ids1 = np.fromiter((q.get("question_num") for q in results1), dtype=object, count=len(results1))
+    ids2 = np.fromiter((q.get("question_num") for q in results2), dtype=object, count=len(results2))
+    if (ids1 != ids2).any():
+        raise ValueError("question_num mismatch; inputs are not aligned")
 
-        m1 = str(q1.get("grade", "")).strip().upper() == "T"
-        m2 = str(q2.get("grade", "")).strip().upper() == "T"
-
-        if m1 and m2:
-            a += 1
-        elif m1 and not m2:
-            b += 1
-        elif (not m1) and m2:
-            c += 1
-        else:
-            d += 1
+    m1 = _correct_mask(results1)
+    m2 = _correct_mask(results2)
+    a = int((m1 & m2).sum())
+    b = int((m1 & ~m2).sum())
+    c = int((~m1 & m2).sum())
+    d = int((~m1 & ~m2).sum())
 
     return {"model1": file1.stem, "model2": file2.stem, "a": a, "b": b, "c": c, "d": d, "total": a + b + c + d}
 
@@ -65,14 +69,13 @@ def calculate_mcnemar_statistic(b: int, c: int) -> float:
 
 def main() -> int:
     args = build_argparser().parse_args()
-    if not args.file1.exists():
-        raise SystemExit(f"can't find {args.file1}")
-    if not args.file2.exists():
-        raise SystemExit(f"can't find {args.file2}")
-
-    results = calculate_mcnemar_values(args.file1, args.file2)
+    try:
+        results = calculate_mcnemar_values(args.file1, args.file2)
+    except FileNotFoundError as exc:
+        raise SystemExit(f"can't find {exc.filename}") from None
     chi_sq = calculate_mcnemar_statistic(int(results["b"]), int(results["c"]))
-    p_value = 1 - chi2.cdf(chi_sq, df=1)
+    # Survival function of chi-squared with df=1: P(X > x) = erfc(sqrt(x / 2)).
+    p_value = math.erfc(math.sqrt(chi_sq / 2.0))
 
     print(f"\ncomparing {results['model1']} vs {results['model2']}")
     print(f"both correct: {results['a']}")
@@ -4,6 +4,7 @@
 Supports:
 - comparing two `.json` files
 - comparing two `.txt` files that list multiple `.json` paths (concatenated)
+- comparing many pairs at once via `--pairs` (one `file1 file2` per line)
 
 Appends results to `mcnemar_results.csv` by default.
 """
@@ -12,16 +13,24 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
 import csv
 from pathlib import Path
 from typing import Any
-from scipy.stats import chi2
+
+import numpy as np
 
 
 def build_argparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Compute McNemar test between two model result sets")
-    parser.add_argument("file1", type=Path, help=".json file or .txt containing paths")
-    parser.add_argument("file2", type=Path, help=".json file or .txt containing paths")
+    parser.add_argument("file1", type=Path, nargs="?", help=".json file or .txt containing paths")
+    parser.add_argument("file2", type=Path, nargs="?", help=".json file or .txt containing paths")
+    parser.add_argument(
+        "--pairs",
+        type=Path,
+        default=None,
+        help="Text file with two paths per line; compares every pair and writes the CSV once",
+    )
     parser.add_argument("--output-csv", type=Path, default=Path("mcnemar_results.csv"))
     parser.add_argument("--no-append", action="store_true", help="Do not write CSV output")
     return parser
@@ -63,6 +72,20 @@ def load_model_results(input_path):
     else:
         raise ValueError(f"input must be .json or .txt file, got {input_path.suffix}")
 
+def _correct_mask(results):
+    """Boolean array that is True where the item was graded 'T'"""
+    return np.fromiter(
+        (str(q.get('grade', '')).strip().upper() == 'T' for q in results), dtype=bool, count=len(results)
+    )
+
+def _question_ids(results):
+    """question_num per item as an object array (ids may be any JSON value), None where it is missing"""
+    return np.fromiter((q.get('question_num') for q in results), dtype=object, count=len(results))
+
+def _has_question_num(results):
+    """Boolean array that is True where the item carries a question_num key"""
+    return np.fromiter(('question_num' in q for q in results), dtype=bool, count=len(results))
+
 def calculate_mcnemar_values(file1, file2):
     results1, model1_name = load_model_results(file1)
     results2, model2_name = load_model_results(file2)
@@ -79,30 +102,23 @@ def calculate_mcnemar_values(file1, file2):
         results1 = results1[:min_len]
         results2 = results2[:min_len]
     
-    a = b = c = d = 0
-    
-    # Zip assumes the lists are ordered correspondingly. 
-    # For our use case (concatenated EN+NO lists), this is correct as long as 
+    # Element-wise alignment assumes the lists are ordered correspondingly.
+    # For our use case (concatenated EN+NO lists), this is correct as long as
     # the input .txt files listed EN then NO in the same order for both models.
-    for q1, q2 in zip(results1, results2):
-        # Relaxed assertion: only check question_num if it's present
-        if 'question_num' in q1 and 'question_num' in q2:
-            if q1['question_num'] != q2['question_num']:
-                # This might happen if one file is missing a question in the middle
-                # But for now we'll just warn and continue, or trust the order
-                pass 
-        
-        m1 = str(q1.get('grade', '')).strip().upper() == 'T'
-        m2 = str(q2.get('grade', '')).strip().upper() == 'T'
-        
-        if m1 and m2:
-            a += 1
-        elif m1 and not m2:
-            b += 1
-        elif not m1 and m2:
-            c += 1
-        else:
-            d += 1
+    # Check it once up front, only where both sides carry a question_num.
+    ids1 = _question_ids(results1)
+    ids2 = _question_ids(results2)
+    present = _has_question_num(results1) & _has_question_num(results2)
+    mismatched = int(((ids1 != ids2) & present).sum())
+    if mismatched:
+        print(f"warning: question_num differs at {mismatched} positions; trusting list order")
+    
+    m1 = _correct_mask(results1)
+    m2 = _correct_mask(results2)
+    a = int((m1 & m2).sum())
+    b = int((m1 & ~m2).sum())
+    c = int((~m1 & m2).sum())
+    d = int((~m1 & ~m2).sum())
     
     return {
         'model1': model1_name,
@@ -117,44 +133,43 @@ def calculate_mcnemar_statistic(b, c):
     
     return ((abs(b - c) - 1) ** 2) / (b + c)
 
-def append_to_csv(results: dict[str, Any], chi_sq: float, p_value: float, output_file: Path) -> None:
-    """Append results to CSV file"""
-    output_path = Path(output_file)
-    file_exists = output_path.exists()
-    
-    with open(output_path, 'a', newline='', encoding='utf-8') as f:
+CSV_HEADER = ['model1', 'model2', 'a', 'b', 'c', 'd', 'chi_squared', 'p_value', 'significant']
+
+def _csv_row(results: dict[str, Any], chi_sq: float, p_value: float) -> list[Any]:
+    significant = 'yes' if p_value < 0.05 else 'no'
+    return [
+        results['model1'],
+        results['model2'],
+        results['a'],
+        results['b'],
+        results['c'],
+        results['d'],
+        f"{chi_sq:.3f}",
+        f"{p_value:.4f}",
+        significant
+    ]
+
+def append_to_csv_many(rows: list[tuple[dict[str, Any], float, float]], output_file: Path) -> None:
+    """Append several (results, chi_sq, p_value) rows to the CSV file with a single open"""
+    with open(Path(output_file), 'a', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         
-        # Write header if file doesn't exist
-        if not file_exists:
-            writer.writerow(['model1', 'model2', 'a', 'b', 'c', 'd', 'chi_squared', 'p_value', 'significant'])
+        # Write header if the file is new or empty (append mode starts at the end)
+        if f.tell() == 0:
+            writer.writerow(CSV_HEADER)
         
-        # Write data row
-        significant = 'yes' if p_value < 0.05 else 'no'
-        writer.writerow([
-            results['model1'],
-            results['model2'],
-            results['a'],
-            results['b'],
-            results['c'],
-            results['d'],
-            f"{chi_sq:.3f}",
-            f"{p_value:.4f}",
-            significant
-        ])
+        writer.writerows([_csv_row(results, chi_sq, p_value) for results, chi_sq, p_value in rows])
 
-def main() -> int:
-    args = build_argparser().parse_args()
-    file1 = Path(args.file1)
-    file2 = Path(args.file2)
-    if not file1.exists():
-        raise SystemExit(f"can't find {file1}")
-    if not file2.exists():
-        raise SystemExit(f"can't find {file2}")
+def append_to_csv(results: dict[str, Any], chi_sq: float, p_value: float, output_file: Path) -> None:
+    """Append results to CSV file"""
+    append_to_csv_many([(results, chi_sq, p_value)], output_file)
 
+def compare(file1: Path, file2: Path) -> tuple[dict[str, Any], float, float]:
+    """Run the McNemar test for one pair and print a summary"""
     results = calculate_mcnemar_values(file1, file2)
     chi_sq = calculate_mcnemar_statistic(results['b'], results['c'])
-    p_value = 1 - chi2.cdf(chi_sq, df=1)
+    # Survival function of chi-squared with df=1: P(X > x) = erfc(sqrt(x / 2)).
+    p_value = math.erfc(math.sqrt(chi_sq / 2.0))
     
     print(f"\ncomparing {results['model1']} vs {results['model2']}")
     print(f"both correct: {results['a']}")
@@ -169,10 +184,64 @@ def main() -> int:
         print(f"statistically significant (p<0.05) - {winner} is better")
     else:
         print("not statistically significant, basically the same")
+    return results, chi_sq, p_value
+
+def load_pairs(pairs_file: Path) -> list[tuple[Path, Path]]:
+    """Read a pairs file: two whitespace-separated paths per line, '#' starts a comment"""
+    pairs = []
+    for line in pairs_file.read_text(encoding="utf-8").splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) != 2:
+            raise SystemExit(f"expected two paths per line in {pairs_file}, got: {line!r}")
+        pairs.append((Path(parts[0]), Path(parts[1])))
+    return pairs
+
+def main_matrix(pairs: list[tuple[Path, Path]], output_file: Path | None) -> int:
+    """Compare every pair, then write all CSV rows in one flush"""
+    rows = []
+    for file1, file2 in pairs:
+        if not file1.exists() or not file2.exists():
+            print(f"warning: can't find {file1 if not file1.exists() else file2}, skipping pair")
+            continue
+        try:
+            rows.append(compare(file1, file2))
+        except (ValueError, OSError) as exc:
+            # bad suffix or malformed json: skip the pair, keep the rows computed so far
+            print(f"warning: can't compare {file1} vs {file2}: {exc}, skipping pair")
+    
+    if output_file is not None and rows:
+        append_to_csv_many(rows, output_file)
+        print(f"\n{len(rows)} results appended to {output_file}")
+    return 0
+
+def main() -> int:
+    parser = build_argparser()
+    args = parser.parse_args()
+    output_csv = None if args.no_append else args.output_csv
+    if args.pairs is not None:
+        if args.file1 is not None or args.file2 is not None:
+            parser.error("--pairs can't be combined with file1/file2")
+        if not args.pairs.exists():
+            raise SystemExit(f"can't find {args.pairs}")
+        return main_matrix(load_pairs(args.pairs), output_csv)
+
+    if args.file1 is None or args.file2 is None:
+        parser.error("need file1 and file2 (or --pairs)")
+    file1 = Path(args.file1)
+    file2 = Path(args.file2)
+    if not file1.exists():
+        raise SystemExit(f"can't find {file1}")
+    if not file2.exists():
+        raise SystemExit(f"can't find {file2}")
+
+    results, chi_sq, p_value = compare(file1, file2)
     
-    if not args.no_append:
-        append_to_csv(results, chi_sq, p_value, output_file=args.output_csv)
-        print(f"\nresults appended to {args.output_csv}")
+    if output_csv is not None:
+        append_to_csv(results, chi_sq, p_value, output_file=output_csv)
+        print(f"\nresults appended to {output_csv}")
     return 0
 
 
@@ -15,15 +15,23 @@ import argparse
 import json
 import os
 import re
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import httpx
 from dotenv import load_dotenv
 from ollama import Client
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 THINK_REGEX = re.compile(r"<think>.*</think>\n?", flags=re.DOTALL)
 
@@ -39,6 +47,7 @@ class EvalConfig:
     max_retries: int
     retry_sleep_s: float
     strip_think: bool
+    concurrency: int
 
 
 def build_argparser() -> argparse.ArgumentParser:
@@ -56,6 +65,13 @@ def build_argparser() -> argparse.ArgumentParser:
     parser.add_argument("--ollama-host", default=os.getenv("OLLAMA_HOST", "http://localhost:11434"))
     parser.add_argument("--max-retries", type=int, default=3)
     parser.add_argument("--retry-sleep-s", type=float, default=10.0)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("CONCURRENCY", "1")),
+        help="Number of questions sent to Ollama in parallel. Values above 1 shorten "
+        "duration_s, so GPU-hours are only comparable between runs with the same concurrency",
+    )
     parser.add_argument("--no-strip-think", action="store_true", help="Do not strip <think>...</think> blocks")
     return parser
 
@@ -74,7 +90,10 @@ def _sanitize_filename_component(name: str) -> str:
 
 
 def _load_pairs(path: Path, num_q: int) -> list[dict[str, Any]]:
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    try:
+        raw = json.loads(path.read_bytes())
+    except FileNotFoundError:
+        raise SystemExit(f"QA file not found: {path}") from None
     if not isinstance(raw, dict) or "qa_pairs" not in raw:
         raise ValueError(f"Invalid QA file schema: expected object with 'qa_pairs': {path}")
     pairs = raw["qa_pairs"]
@@ -83,6 +102,16 @@ def _load_pairs(path: Path, num_q: int) -> list[dict[str, Any]]:
     return pairs[:num_q]
 
 
+def _write_json(path: Path, data: Any) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        return
+    # Stream straight into a large buffer instead of building the whole string first.
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
 def _get_system_prompt(lang: str) -> str:
     is_no = lang.lower().startswith("no")
     if is_no:
@@ -96,57 +125,73 @@ def _get_system_prompt(lang: str) -> str:
     )
 
 
+def _answer_question(
+    client: Client,
+    config: EvalConfig,
+    system_msg: dict[str, str],
+    idx: int,
+    question: str,
+) -> str:
+    ans: str
+    last_exc: Exception | None = None
+    for attempt in range(1, config.max_retries + 1):
+        try:
+            ans = client.chat(
+                model=config.model,
+                messages=[system_msg, {"role": "user", "content": question}],
+            )["message"]["content"]
+
+            ans = THINK_REGEX.sub("", ans).strip() if config.strip_think else ans.strip()
+            break
+        except Exception as exc:
+            last_exc = exc
+            # Runs on a worker thread. print() writes the text and the newline separately, so
+            # emit the whole line in one write to keep it from interleaving with other workers.
+            # With --concurrency > 1 these lines can still come out of question order.
+            sys.stdout.write(f"error on question {idx}, attempt {attempt}/{config.max_retries}: {exc}\n")
+            if attempt < config.max_retries:
+                time.sleep(config.retry_sleep_s)
+    else:
+        ans = f"ERROR: {last_exc}" if last_exc else "ERROR"
+    return ans
+
+
 def run_eval(config: EvalConfig) -> tuple[dict[str, Any], list[dict[str, Any]]]:
     config.out_dir.mkdir(parents=True, exist_ok=True)
-    client = Client(host=config.ollama_host)
+    # A single client is shared across worker threads. Extra kwargs go to the underlying
+    # httpx.Client; size its keep-alive pool so every worker reuses an open connection.
+    pool_size = max(1, config.concurrency)
+    client = Client(
+        host=config.ollama_host,
+        limits=httpx.Limits(max_keepalive_connections=pool_size, max_connections=pool_size),
+    )
 
     pairs = _load_pairs(config.qa_path, config.num_q)
-    system_prompt = _get_system_prompt(config.lang)
+    # Ollama only reads the message content, so one system message is shared by every request.
+    system_msg = {"role": "system", "content": _get_system_prompt(config.lang)}
 
-    qa_results: list[dict[str, Any]] = []
     start = time.time()
 
-    print(f"starting eval: model={config.model} lang={config.lang} num_q={len(pairs)}")
-    for idx, pair in enumerate(pairs):
-        question = str(pair.get("question", ""))
-        ref_answer = str(pair.get("answer", ""))
-
-        ans: str
-        last_exc: Exception | None = None
-        for attempt in range(1, config.max_retries + 1):
-            try:
-                ans = client.chat(
-                    model=config.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question},
-                    ],
-                )["message"]["content"]
-
-                if config.strip_think:
-                    ans = re.sub(THINK_REGEX, "", str(ans)).strip()
-                else:
-                    ans = str(ans).strip()
-                break
-            except Exception as exc:
-                last_exc = exc
-                print(f"error on question {idx}, attempt {attempt}/{config.max_retries}: {exc}")
-                if attempt < config.max_retries:
-                    time.sleep(config.retry_sleep_s)
-        else:
-            ans = f"ERROR: {last_exc}" if last_exc else "ERROR"
-
-        if (idx + 1) % 25 == 0 or idx == 0:
-            print("evaluating question", idx, "time:", datetime.now())
-
-        qa_results.append(
-            {
-                "question_num": idx,
-                "question": question,
-                "model_ans": ans,
-                "correct_ans": ref_answer,
-            }
-        )
+    print(
+        f"starting eval: model={config.model} lang={config.lang} num_q={len(pairs)} "
+        f"concurrency={config.concurrency}"
+    )
+    # Keep the per-question fields in parallel lists and only build dicts once at the end.
+    questions = [str(pair.get("question", "")) for pair in pairs]
+    correct_ans = [str(pair.get("answer", "")) for pair in pairs]
+    with ThreadPoolExecutor(max_workers=max(1, config.concurrency)) as executor:
+        # `map` yields results in submission order, so answers line up with `questions`
+        # and progress is reported from this thread in question order.
+        model_ans = []
+        for idx, ans in enumerate(
+            executor.map(
+                lambda item: _answer_question(client, config, system_msg, *item),
+                enumerate(questions),
+            )
+        ):
+            model_ans.append(ans)
+            if (idx + 1) % 25 == 0 or idx == 0:
+                print(f"evaluating question {idx} time: {datetime.now()}")
 
     duration_s = round(time.time() - start, 3)
     result_log = {
@@ -155,11 +200,16 @@ def run_eval(config: EvalConfig) -> tuple[dict[str, Any], list[dict[str, Any]]]:
         "lang": config.lang,
         "num_q": config.num_q,
         "duration_s": duration_s,
+        "concurrency": config.concurrency,
         "slurm_job_id": os.getenv("SLURM_JOB_ID"),
         "slurm_array_task_id": os.getenv("SLURM_ARRAY_TASK_ID"),
         "node": os.getenv("SLURMD_NODENAME"),
     }
     print("finished eval in", duration_s, "seconds")
+    qa_results = [
+        {"question_num": i, "question": q, "model_ans": a, "correct_ans": r}
+        for i, (q, a, r) in enumerate(zip(questions, model_ans, correct_ans))
+    ]
     return result_log, qa_results
 
 
@@ -177,19 +227,14 @@ def main() -> int:
         max_retries=int(args.max_retries),
         retry_sleep_s=float(args.retry_sleep_s),
         strip_think=not bool(args.no_strip_think),
+        concurrency=int(args.concurrency),
     )
 
     result_log, qa_results = run_eval(config)
     file_stem = f"{_sanitize_filename_component(config.model)}-{config.lang}"
 
-    (config.out_dir / f"{file_stem}.log").write_text(
-        json.dumps(result_log, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
-    (config.out_dir / f"{file_stem}.json").write_text(
-        json.dumps(qa_results, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
+    _write_json(config.out_dir / f"{file_stem}.log", result_log)
+    _write_json(config.out_dir / f"{file_stem}.json", qa_results)
     return 0
 
 
@@ -5,8 +5,14 @@ from __future__ import annotations
 import argparse
 import json
 import os
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
+
+try:
+  import ijson
+except ImportError:  # pragma: no cover
+  ijson = None
 
 
 def build_argparser() -> argparse.ArgumentParser:
@@ -31,24 +37,55 @@ def build_argparser() -> argparse.ArgumentParser:
   return parser
 
 
+def iter_items(f: IO[bytes]) -> Iterator[dict[str, Any]]:
+  """Iterate the items of a top-level JSON list, one at a time when ijson is available."""
+  head = f.read(1)
+  while head.isspace():
+    head = f.read(1)
+  if head != b"[":
+    raise SystemExit("expected input JSON to be a list")
+  f.seek(0)
+
+  if ijson is not None:
+    return ijson.items(f, "item", use_float=True)
+  return iter(json.load(f))
+
+
+def write_json_list(items: Iterable[dict[str, Any]], out: IO[str]) -> int:
+  """Write items as an indented JSON list (same layout as `json.dumps(indent=2)`)."""
+  count = 0
+  for item in items:
+    out.write(",\n" if count else "[\n")
+    out.write("  " + json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+    count += 1
+  out.write("\n]\n" if count else "[]\n")
+  return count
+
+
 def main() -> int:
   args = build_argparser().parse_args()
   input_path: Path = args.input
-  if not input_path.exists():
-    raise SystemExit(f"input not found: {input_path}")
-
-  raw = json.loads(input_path.read_text(encoding="utf-8"))
-  if not isinstance(raw, list):
-    raise SystemExit("expected input JSON to be a list")
+  try:
+    f_in = input_path.open("rb")
+  except FileNotFoundError:
+    raise SystemExit(f"input not found: {input_path}") from None
 
-  incorrect: list[dict[str, Any]] = []
-  for item in raw:
-    grade = str(item.get(args.grade_key, "")).strip().upper()
-    if grade != "T":
-      incorrect.append(item)
+  with f_in:
+    incorrect = (
+      item for item in iter_items(f_in) if str(item.get(args.grade_key, "")).strip().upper() != "T"
+    )
+    # write beside the target and swap in at the end: --output may be --input,
+    # and a parse error partway through must not leave a truncated file
+    tmp_path = args.output.with_name(args.output.name + ".tmp")
+    try:
+      with tmp_path.open("w", encoding="utf-8") as f_out:
+        written = write_json_list(incorrect, f_out)
+    except BaseException:
+      tmp_path.unlink(missing_ok=True)
+      raise
+  os.replace(tmp_path, args.output)
 
-  args.output.write_text(json.dumps(incorrect, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-  print(f"wrote {len(incorrect)} incorrect items to {args.output}")
+  print(f"wrote {written} incorrect items to {args.output}")
   return 0
 
 
@@ -10,14 +10,12 @@ import argparse
 import json
 import os
 import sys
-from collections import defaultdict
 from pathlib import Path
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import numpy as np
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 
 def split_model_lang(stem: str) -> tuple[str, str] | None:
@@ -47,8 +45,12 @@ def build_argparser() -> argparse.ArgumentParser:
 def main() -> int:
     args = build_argparser().parse_args()
     out_dir: Path = args.out_dir
-    log_files = sorted(out_dir.glob("*.log"))
-    families: dict[str, dict[str, dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
+    if not out_dir.is_dir():
+        print(f"results dir not found: {out_dir}", file=sys.stderr)
+        return 1
+    with os.scandir(out_dir) as it:
+        log_files = sorted(Path(entry.path) for entry in it if entry.name.endswith(".log"))
+    accuracies: dict[tuple[str, str], float] = {}
 
     print(f"Found {len(log_files)} log files to process...")
     for log_path in log_files:
@@ -63,23 +65,34 @@ def main() -> int:
             if "-all-gpus" in model_name:
                 model_name = model_name.replace("-all-gpus", "")
 
-            log_data = json.loads(log_path.read_text(encoding="utf-8"))
+            raw = log_path.read_bytes()
+            # Ungraded runs have no accuracy yet; a substring scan is cheaper than a full parse.
+            if b'"accuracy"' not in raw:
+                continue
+            log_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             accuracy = float(log_data.get("accuracy", 0.0))
-            families[model_name][lang] = {"accuracy": accuracy}
+            accuracies[(model_name, lang)] = accuracy
         except Exception as exc:
             print(f"Warning: could not process file {log_path}: {exc}", file=sys.stderr)
 
-    if not families:
+    if not accuracies:
         print("No results found in .log files.", file=sys.stderr)
         return 1
 
+    # Deferred so `--help` and early error exits don't pay for importing matplotlib.
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     fig, ax = plt.subplots(layout="constrained")
     width = 0.35
-    models = sorted(families.keys())
+    models = sorted({model for model, _ in accuracies})
     x = np.arange(len(models))
 
-    en_scores = [families[m].get("en", {}).get("accuracy", 0.0) * 100 for m in models]
-    no_scores = [families[m].get("no", {}).get("accuracy", 0.0) * 100 for m in models]
+    en_scores = [accuracies.get((m, "en"), 0.0) * 100 for m in models]
+    no_scores = [accuracies.get((m, "no"), 0.0) * 100 for m in models]
 
     ax.bar(x - width / 2, en_scores, width, label="English Prompt")
     ax.bar(x + width / 2, no_scores, width, label="Norwegian Prompt")
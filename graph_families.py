@@ -8,23 +8,35 @@ import os
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
+from typing import Any
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+_SIZE_RE = re.compile(r"(\d+\.?\d*)([bBmM])")
+_FAMILY_RE = re.compile(r"([a-zA-Z0-9\-\.]+)")
+
+# Every supported suffix is a separator plus a two-letter language code.
+_LANG_SUFFIXES = ("_en", "-en", ":en", "_no", "-no", ":no")
+_SUFFIX_TO_LANG = {suffix: suffix[1:] for suffix in _LANG_SUFFIXES}
 
 
 def split_model_lang(stem: str) -> tuple[str, str] | None:
     """Split a log filename stem into (model, lang) for multiple conventions."""
 
-    for lang in ("en", "no"):
-        for sep in ("_", "-", ":"):
-            suffix = f"{sep}{lang}"
-            if stem.endswith(suffix) and len(stem) > len(suffix):
-                return stem[: -len(suffix)], lang
+    if len(stem) > 3 and stem.endswith(_LANG_SUFFIXES):
+        return stem[:-3], _SUFFIX_TO_LANG[stem[-3:]]
     return None
 
 
@@ -35,6 +47,7 @@ def build_argparser() -> argparse.ArgumentParser:
     return parser
 
 
+@lru_cache(maxsize=256)
 def parse_model_size(model_name: str) -> tuple[float, str]:
     """Return (numeric_size_in_B, label) extracted from model name."""
     if "llama" in model_name and "instruct" in model_name:
@@ -44,7 +57,7 @@ def parse_model_size(model_name: str) -> tuple[float, str]:
             return 7.0, "7B-core-scratch-instruct"
         return 8.0, "7B-core-instruct"
 
-    match = re.search(r"(\d+\.?\d*)([bBmM])", model_name)
+    match = _SIZE_RE.search(model_name)
     if not match:
         return 0.0, model_name
     value_str, unit = match.groups()
@@ -55,6 +68,74 @@ def parse_model_size(model_name: str) -> tuple[float, str]:
     return value, label
 
 
+def _load_one(log_path: Path) -> tuple[str, str, float, float, str] | None:
+    """Return (family, lang, numeric_size, accuracy, size_label) for one log file."""
+    parsed = split_model_lang(log_path.stem)
+    if parsed is None:
+        raise ValueError("invalid name for log file")
+    model_name, lang = parsed
+
+    family_match = _FAMILY_RE.match(model_name)
+    if not family_match:
+        return None
+
+    numeric_size, size_label = parse_model_size(model_name)
+    raw = log_path.read_bytes()
+    log_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    accuracy = float(log_data.get("accuracy", 0.0))
+    return family_match.group(1), lang, numeric_size, accuracy, size_label
+
+
+def _render_family(
+    family_name: str,
+    per_size: dict[float, dict[str, Any]],
+    graph_dir: Path,
+) -> Path | None:
+    """Draw and save one family's bar chart; returns the PNG path, or None if there is no data."""
+    items = sorted(per_size.items())
+    if not items:
+        return None
+
+    labels = [v["label"] for _, v in items]
+    en_scores = [v["en"] for _, v in items]
+    no_scores = [v["no"] for _, v in items]
+
+    x = np.arange(len(labels))
+    width = 0.35
+
+    # Plain Figure + Agg canvas: no pyplot state machine or figure registry.
+    fig = Figure(figsize=(10, 6), layout="constrained")
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.bar(x - width / 2, en_scores, width, label="English Prompt", color="royalblue")
+    ax.bar(x + width / 2, no_scores, width, label="Norwegian Prompt", color="darkorange")
+
+    ax.set_ylabel("Accuracy (%)", fontsize=15)
+    ax.set_xlabel("Model Size (Parameters)", fontsize=15)
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, fontsize=19)
+    ax.legend()
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+
+    # Label bar tops directly, skipping missing (zero) runs instead of printing "0.0".
+    for xs, scores in ((x - width / 2, en_scores), (x + width / 2, no_scores)):
+        for xi, score in zip(xs, scores):
+            if score:
+                ax.annotate(
+                    f"{score:.1f}",
+                    (xi, score),
+                    xytext=(0, 3),
+                    textcoords="offset points",
+                    ha="center",
+                    va="bottom",
+                    fontsize=14,
+                )
+
+    graph_filename = graph_dir / f"{family_name}.png"
+    fig.savefig(graph_filename)
+    return graph_filename
+
+
 def main() -> int:
     args = build_argparser().parse_args()
     results_dir: Path = args.out_dir
@@ -63,76 +144,39 @@ def main() -> int:
     print(f"Graphs will be saved in '{graph_dir}/'")
 
     log_files = sorted(results_dir.glob("*.log"))
-    families: dict[str, dict[str, list[tuple[float, float, str]]]] = defaultdict(lambda: defaultdict(list))
+    # family -> numeric size -> {"label": size label, "en": accuracy %, "no": accuracy %}
+    families: dict[str, dict[float, dict[str, Any]]] = defaultdict(dict)
     print(f"Found {len(log_files)} log files to process...")
 
-    for log_path in log_files:
-        try:
-            stem = log_path.stem
-            parsed = split_model_lang(stem)
-            if parsed is None:
-                raise ValueError("invalid name for log file")
-            model_name, lang = parsed
-
-            family_match = re.match(r"([a-zA-Z0-9\-\.]+)", model_name)
-            if not family_match:
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        # Reads overlap on the pool; results are consumed in file order.
+        futures = [(log_path, executor.submit(_load_one, log_path)) for log_path in log_files]
+        for log_path, future in futures:
+            try:
+                loaded = future.result()
+            except Exception as exc:
+                print(f"Warning: could not process file {log_path}: {exc}", file=sys.stderr)
                 continue
-            family_name = family_match.group(1)
-
-            numeric_size, size_label = parse_model_size(model_name)
-            log_data = json.loads(log_path.read_text(encoding="utf-8"))
-            accuracy = float(log_data.get("accuracy", 0.0))
-            families[family_name][lang].append((numeric_size, accuracy, size_label))
-        except Exception as exc:
-            print(f"Warning: could not process file {log_path}: {exc}", file=sys.stderr)
+            if loaded is None:
+                continue
+            family_name, lang, numeric_size, accuracy, size_label = loaded
+            per_size = families[family_name].setdefault(numeric_size, {"label": size_label, "en": 0.0, "no": 0.0})
+            per_size[lang] = accuracy * 100
 
     if not families:
         print("No model families found. Exiting.", file=sys.stderr)
         return 1
 
-    for family_name, lang_data in families.items():
-        print(f"Generating graph for family: {family_name}")
-
-        all_models: dict[float, str] = {}
-        for data_list in lang_data.values():
-            for numeric_size, _, size_label in data_list:
-                all_models.setdefault(numeric_size, size_label)
-
-        sorted_models = sorted(all_models.items())
-        if not sorted_models:
-            print(f"  - Skipping {family_name}, no data to plot.")
-            continue
-
-        labels = [item[1] for item in sorted_models]
-        en_scores_map = {size: acc for size, acc, _ in lang_data.get("en", [])}
-        no_scores_map = {size: acc for size, acc, _ in lang_data.get("no", [])}
-        en_scores = [en_scores_map.get(size, 0.0) * 100 for size, _ in sorted_models]
-        no_scores = [no_scores_map.get(size, 0.0) * 100 for size, _ in sorted_models]
-
-        x = np.arange(len(labels))
-        width = 0.35
-
-        fig, ax = plt.subplots(figsize=(10, 6), layout="constrained")
-        rects1 = ax.bar(x - width / 2, en_scores, width, label="English Prompt", color="royalblue")
-        rects2 = ax.bar(x + width / 2, no_scores, width, label="Norwegian Prompt", color="darkorange")
-
-        ax.plot(x - width / 2, en_scores, marker="o", color="navy", linestyle="--")
-        ax.plot(x + width / 2, no_scores, marker="o", color="saddlebrown", linestyle="--")
-
-        ax.set_ylabel("Accuracy (%)", fontsize=15)
-        ax.set_xlabel("Model Size (Parameters)", fontsize=15)
-        ax.set_xticks(x)
-        ax.set_xticklabels(labels, fontsize=19)
-        ax.legend()
-        ax.grid(axis="y", linestyle="--", alpha=0.7)
-
-        ax.bar_label(rects1, padding=3, fmt="%.1f", fontsize=14)
-        ax.bar_label(rects2, padding=3, fmt="%.1f", fontsize=14)
-
-        graph_filename = graph_dir / f"{family_name}.png"
-        plt.savefig(graph_filename)
-        plt.close(fig)
-        print(f"  - Saved graph to {graph_filename}")
+    # Agg rasterization is CPU-bound and matplotlib is not thread-safe, so render in processes.
+    names = list(families)
+    with ProcessPoolExecutor(max_workers=min(len(names), os.cpu_count() or 1)) as executor:
+        saved = executor.map(_render_family, names, [families[n] for n in names], repeat(graph_dir))
+        for family_name, graph_filename in zip(names, saved):
+            print(f"Generating graph for family: {family_name}")
+            if graph_filename is None:
+                print(f"  - Skipping {family_name}, no data to plot.")
+            else:
+                print(f"  - Saved graph to {graph_filename}")
 
     print("\nAll family graphs generated.")
     return 0
@@ -11,6 +11,11 @@ import os
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 def build_argparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Find question IDs all models got correct/incorrect")
@@ -26,17 +31,42 @@ def build_argparser() -> argparse.ArgumentParser:
     return parser
 
 
+def _encode_item(item: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(item, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_json_list(items: list[Any], path: Path) -> None:
+    """Write `items` as an indented JSON list, encoding one item at a time.
+
+    The layout matches `json.dumps(items, indent=2)`, but the full document is never
+    held in memory as a single string.
+    """
+    with path.open("wb") as f:
+        if not items:
+            f.write(b"[]\n")
+            return
+        f.write(b"[\n")
+        for i, item in enumerate(items):
+            if i:
+                f.write(b",\n")
+            f.write(b"  " + _encode_item(item).replace(b"\n", b"\n  "))
+        f.write(b"\n]\n")
+
+
 def main() -> int:
     args = build_argparser().parse_args()
     result_files = sorted(args.out_dir.glob("*.json"))
     if not result_files:
         raise SystemExit(f"no results JSON files found in {args.out_dir}")
 
-    all_correct: set[int] | None = None
-    all_incorrect: set[int] | None = None
+    correct_sets: list[set[int]] = []
+    incorrect_sets: list[set[int]] = []
 
     for p in result_files:
-        raw = json.loads(p.read_text(encoding="utf-8"))
+        raw_bytes = p.read_bytes()
+        raw = orjson.loads(raw_bytes) if orjson is not None else json.loads(raw_bytes)
         if not isinstance(raw, list):
             continue
 
@@ -51,22 +81,20 @@ def main() -> int:
                 # Treat missing/unknown grades as incorrect by default.
                 incorrect_ids.add(qid)
 
-        if all_correct is None:
-            all_correct = correct_ids
-            all_incorrect = incorrect_ids
-        else:
-            all_correct &= correct_ids
-            all_incorrect &= incorrect_ids
+        correct_sets.append(correct_ids)
+        incorrect_sets.append(incorrect_ids)
 
-    all_correct = all_correct or set()
-    all_incorrect = all_incorrect or set()
+    # One variadic intersection per side instead of N-1 in-place `&=` passes.
+    all_correct = set.intersection(*correct_sets) if correct_sets else set()
+    all_incorrect = set.intersection(*incorrect_sets) if incorrect_sets else set()
     print("answers all models answered correctly", sorted(all_correct))
     print("answers all models answered incorrectly", sorted(all_incorrect))
 
     if not args.reference.exists():
         raise SystemExit(f"reference file not found: {args.reference}")
 
-    ref_raw = json.loads(args.reference.read_text(encoding="utf-8"))
+    ref_bytes = args.reference.read_bytes()
+    ref_raw = orjson.loads(ref_bytes) if orjson is not None else json.loads(ref_bytes)
     if not isinstance(ref_raw, list):
         raise SystemExit("reference JSON must be a list")
 
@@ -76,7 +104,7 @@ def main() -> int:
         if qid in all_incorrect:
             incorrect.append(item)
 
-    args.output.write_text(json.dumps(incorrect, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    write_json_list(incorrect, args.output)
     print(f"wrote {len(incorrect)} items to {args.output}")
     return 0
 
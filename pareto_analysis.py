@@ -16,9 +16,11 @@ from __future__ import annotations
 
 import argparse
 import json
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from pathlib import Path
 from typing import Any
 
@@ -27,6 +29,11 @@ try:
 except Exception:  # pragma: no cover
         adjust_text = None
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 # model family colors - high contrast, distinguishable
 FAMILY_COLORS = {
     'deepseek': '#e41a1c',    # bright red
@@ -40,6 +47,9 @@ FAMILY_COLORS = {
     'qwq': '#a65628',         # brown
 }
 
+# families checked most-specific (longest) first so substring matches don't shadow each other
+_FAMILY_KEYS = tuple(sorted(FAMILY_COLORS, key=len, reverse=True))
+
 # parameter counts (in billions)
 PARAM_COUNTS = {
     'deepseek-r1:1.5b': 1.5, 'deepseek-r1:7b': 7, 'deepseek-r1:14b': 14,
@@ -60,36 +70,48 @@ PARAM_COUNTS = {
     'gpt-oss:20b': 20, 'gpt-oss:120b': 120,
 }
 
+# language suffix -> language; every suffix is a separator plus a two-letter code
+_LANG_SUFFIXES = {f"{sep}{lang}": lang for lang in ("en", "no") for sep in ("_", "-", ":")}
+
+# adjust_text is a force-directed layout, so cost grows with labels x iterations;
+# past this many labels it's slow and can't untangle them anyway
+_ADJUST_TEXT_MAX_LABELS = 50
+_ADJUST_TEXT_ITER_LIM = 50
+
 def get_model_family(model_name):
     """extract model family from name"""
     name_lower = model_name.lower()
-    for family in FAMILY_COLORS.keys():
+    for family in _FAMILY_KEYS:
         if family in name_lower:
             return family
     return 'other'
 
+# skip atime updates on linux; the kernel refuses O_NOATIME for files we don't own
+_O_NOATIME = getattr(os, 'O_NOATIME', 0)
+
+def _noatime_opener(path, flags):
+    try:
+        return os.open(path, flags | _O_NOATIME)
+    except PermissionError:
+        return os.open(path, flags)
+
 def load_log(log_path):
     """get runtime and accuracy from log file"""
-    data = json.loads(Path(log_path).read_text(encoding="utf-8"))
+    with open(log_path, 'rb', opener=_noatime_opener if _O_NOATIME else None) as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     # Remove language suffix if present (supports `_en`, `-en`, `:en` variants).
     stem = Path(log_path).stem
-    model_base = stem
-    for lang in ("en", "no"):
-        for sep in ("_", "-", ":"):
-            suffix = f"{sep}{lang}"
-            if stem.endswith(suffix) and len(stem) > len(suffix):
-                model_base = stem[: -len(suffix)]
-                break
-        else:
-            continue
-        break
+    lang = _LANG_SUFFIXES.get(stem[-3:]) if len(stem) > 3 else None
+    model_base = stem[:-3] if lang else stem
     params = PARAM_COUNTS.get(model_base, 0)
     num_gpus = data.get('num_gpus', 1)
     
     return {
         'model': log_path.stem,
         'model_base': model_base,
+        'lang': lang,
         'hours': data['duration_s'] / 3600,
         'gpu_hours': (data['duration_s'] / 3600) * num_gpus,
         'accuracy': data['accuracy'] * 100,
@@ -102,25 +124,44 @@ def is_pareto_optimal(models):
     """
     find models where no other model beats them in BOTH dimensions
     a model is optimal if no other has BOTH less gpu time AND higher accuracy
+
+    sort by gpu hours and sweep once, tracking the best accuracy among strictly
+    faster models (equal gpu hours never dominate each other) - O(N log N),
+    with the sweep done in numpy
     """
-    pareto = []
-    for i, m1 in enumerate(models):
-        dominated = False
-        for j, m2 in enumerate(models):
-            if i != j:
-                # m2 dominates m1 if it uses less gpu time AND has higher accuracy
-                if m2['gpu_hours'] < m1['gpu_hours'] and m2['accuracy'] > m1['accuracy']:
-                    dominated = True
-                    break
-        pareto.append(not dominated)
-    return pareto
+    if not models:
+        return []
+    gh = np.fromiter((m['gpu_hours'] for m in models), dtype=np.float64, count=len(models))
+    acc = np.fromiter((m['accuracy'] for m in models), dtype=np.float64, count=len(models))
+
+    order = np.argsort(gh, kind='stable')
+    gh_sorted, acc_sorted = gh[order], acc[order]
+    # group models with identical gpu hours
+    new_group = np.r_[True, gh_sorted[1:] != gh_sorted[:-1]]
+    group_id = np.cumsum(new_group) - 1
+    # fmax skips nan, so a nan accuracy never dominates (as with the pairwise > test)
+    group_best = np.fmax.reduceat(acc_sorted, np.flatnonzero(new_group))
+    # best accuracy of any strictly faster group
+    faster_best = np.r_[-np.inf, np.fmax.accumulate(group_best)[:-1]]
+
+    dominated = np.empty(len(models), dtype=bool)
+    # nan gpu hours sort last but nothing is faster than them
+    dominated[order] = (faster_best[group_id] > acc_sorted) & ~np.isnan(gh_sorted)
+    return (~dominated).tolist()
 
 
 def build_argparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Plot Pareto frontier for accuracy vs GPU-hours")
     parser.add_argument("--results-dir", type=Path, default=Path("results"), help="Directory containing .log files")
     parser.add_argument("--out-dir", type=Path, default=Path("."), help="Directory to write PNGs")
-    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--dpi", type=int, default=None,
+                        help="Output resolution (default: 150, or 120 with --fast). "
+                             "Render time scales with pixel count")
+    parser.add_argument("--fast", action="store_true",
+                        help="Quick preview: smaller 10x7in figure at 120 dpi and no adjustText "
+                             "label placement (labels may overlap)")
+    parser.add_argument("--no-adjust-text", action="store_true",
+                        help="Skip adjustText label placement (faster, labels may overlap)")
     return parser
 
 def main() -> int:
@@ -128,24 +169,26 @@ def main() -> int:
     results_dir: Path = args.results_dir
     out_dir: Path = args.out_dir
     out_dir.mkdir(parents=True, exist_ok=True)
+    dpi = int(args.dpi) if args.dpi is not None else (120 if args.fast else 150)
 
     # load all log files
     all_models = []
     
-    for log_file in sorted(results_dir.glob('*.log')):
-        try:
-            all_models.append(load_log(log_file))
-        except Exception as e:
-            print(f"skip {log_file.name}: {e}")
+    # reads overlap on the pool, results are consumed in file order
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        futures = [(log_file, executor.submit(load_log, log_file))
+                   for log_file in sorted(results_dir.glob('*.log'))]
+        for log_file, future in futures:
+            try:
+                all_models.append(future.result())
+            except Exception as e:
+                print(f"skip {log_file.name}: {e}")
     
     print(f"\nloaded {len(all_models)} model runs")
     
     # separate by language
-    def _has_lang_suffix(name: str, lang: str) -> bool:
-        return any(name.endswith(f"{sep}{lang}") for sep in ("_", "-", ":"))
-
-    en_models = [m for m in all_models if _has_lang_suffix(m['model'], 'en')]
-    no_models = [m for m in all_models if _has_lang_suffix(m['model'], 'no')]
+    en_models = [m for m in all_models if m['lang'] == 'en']
+    no_models = [m for m in all_models if m['lang'] == 'no']
     
     print(f"english models: {len(en_models)}")
     print(f"norwegian models: {len(no_models)}")
@@ -159,55 +202,63 @@ def main() -> int:
             continue
         
         print(f"\nprocessing {lang} models...")
-        create_pareto_plot(models, lang, total_gpu_hours, out_dir=out_dir, dpi=int(args.dpi))
+        create_pareto_plot(models, lang, total_gpu_hours, out_dir=out_dir, dpi=dpi, fast=bool(args.fast),
+                           adjust_labels=not args.no_adjust_text)
     return 0
 
-def create_pareto_plot(models: list[dict[str, Any]], lang: str, total_gpu_hours: float, *, out_dir: Path, dpi: int) -> None:
+def create_pareto_plot(models: list[dict[str, Any]], lang: str, total_gpu_hours: float, *, out_dir: Path, dpi: int, fast: bool = False,
+                       adjust_labels: bool = True) -> None:
     """create pareto plot for a specific language"""
-    # find pareto frontier
-    pareto = is_pareto_optimal(models)
+    # find pareto frontier, then pull everything the plot needs into arrays in one pass
+    p = np.array(is_pareto_optimal(models), dtype=bool)
+    gh = np.array([m['gpu_hours'] for m in models], dtype=np.float64)
+    acc = np.array([m['accuracy'] for m in models], dtype=np.float64)
+    colors = np.array([FAMILY_COLORS.get(m['family'], '#95a5a6') for m in models], dtype=object)
+    # pareto optimal model indices, sorted by gpu hours
+    order = np.argsort(gh, kind='stable')
+    pareto_idx = order[p[order]]
     
     # print results sorted by gpu hours
     print(f"\npareto optimal models ({lang}):")
-    for m, p in sorted(zip(models, pareto), key=lambda x: x[0]['gpu_hours']):
-        if p:
-            print(f"  {m['model_base']}: {m['params']:.1f}B params, {m['gpu_hours']:.2f} gpu-h ({m['num_gpus']} gpu × {m['hours']:.2f}h), {m['accuracy']:.1f}% acc")
+    for i in pareto_idx:
+        m = models[i]
+        print(f"  {m['model_base']}: {m['params']:.1f}B params, {m['gpu_hours']:.2f} gpu-h ({m['num_gpus']} gpu × {m['hours']:.2f}h), {m['accuracy']:.1f}% acc")
     
     # make plot
-    fig, ax = plt.subplots(figsize=(14, 10))
+    # plain Figure + Agg canvas, no pyplot state machine
+    fig = Figure(figsize=(10, 7) if fast else (14, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
     
-    # plot all points
-    texts = []
-    for m, p in zip(models, pareto):
-        color = FAMILY_COLORS.get(m['family'], '#95a5a6')
-        marker_size = 150 if p else 80
-        alpha = 0.9 if p else 0.4
-        ax.scatter(m['gpu_hours'], m['accuracy'], c=color, s=marker_size, alpha=alpha,
-                  edgecolors='black', linewidths=2 if p else 0.5, zorder=3 if p else 2)
+    # plot all points: one scatter call per group instead of one per model
+    ax.scatter(gh[~p], acc[~p], c=list(colors[~p]), s=80, alpha=0.4,
+              edgecolors='black', linewidths=0.5, zorder=2)
+    ax.scatter(gh[p], acc[p], c=list(colors[p]), s=150, alpha=0.9,
+              edgecolors='black', linewidths=2, zorder=3)
     
     # add labels for pareto optimal points (non-overlapping)
-    for m, p in zip(models, pareto):
-        if p:
-            # shorter label: model_base without _en/_no
-            label = m['model_base'].split(':')[0] + ':' + m['model_base'].split(':')[-1]
-            label += f"\n{m['params']:.0f}B" if m['params'] >= 1 else f"\n{m['params']*1000:.0f}M"
-            txt = ax.text(m['gpu_hours'], m['accuracy'], label,
-                         fontsize=8, ha='center', va='bottom', 
-                         bbox=dict(boxstyle='round,pad=0.3', facecolor='white', 
-                                  edgecolor='gray', alpha=0.8))
-            texts.append(txt)
+    texts = []
+    for i in pareto_idx:
+        m = models[i]
+        # shorter label: model_base without _en/_no
+        label = m['model_base'].split(':')[0] + ':' + m['model_base'].split(':')[-1]
+        label += f"\n{m['params']:.0f}B" if m['params'] >= 1 else f"\n{m['params']*1000:.0f}M"
+        txt = ax.text(gh[i], acc[i], label,
+                     fontsize=8, ha='center', va='bottom', 
+                     bbox=dict(boxstyle='round,pad=0.3', facecolor='white', 
+                              edgecolor='gray', alpha=0.8))
+        texts.append(txt)
     
     # adjust text positions to avoid overlap (optional dependency)
-    if adjust_text is not None:
-        adjust_text(texts, arrowprops=dict(arrowstyle='->', color='gray', lw=0.5))
+    # a single label can't overlap anything, and very many labels aren't worth the iterations
+    if adjust_text is not None and adjust_labels and not fast and 1 < len(texts) <= _ADJUST_TEXT_MAX_LABELS:
+        adjust_text(texts, ax=ax, iter_lim=_ADJUST_TEXT_ITER_LIM,
+                    only_move={'text': 'xy', 'static': 'y', 'explode': 'xy', 'pull': 'xy'},
+                    arrowprops=dict(arrowstyle='->', color='gray', lw=0.5))
     
     # connect pareto frontier with line
-    pareto_models = sorted([m for m, p in zip(models, pareto) if p], 
-                          key=lambda x: x['gpu_hours'])
-    if len(pareto_models) > 1:
-        gpu_hours_line = [m['gpu_hours'] for m in pareto_models]
-        acc_line = [m['accuracy'] for m in pareto_models]
-        ax.plot(gpu_hours_line, acc_line, 'k--', alpha=0.4, linewidth=2, zorder=1)
+    if len(pareto_idx) > 1:
+        ax.plot(gh[pareto_idx], acc[pareto_idx], 'k--', alpha=0.4, linewidth=2, zorder=1)
     
     # better labels
     lang_name = 'English' if lang == 'en' else 'Norwegian'
@@ -227,11 +278,11 @@ def create_pareto_plot(models: list[dict[str, Any]], lang: str, total_gpu_hours:
     ax.legend(handles=legend_elements, loc='lower right', fontsize=11, 
              framealpha=0.95, title='Model Family', title_fontsize=12)
     
-    plt.tight_layout()
+    # lay out once here; bbox_inches='tight' would render the whole figure twice
+    fig.tight_layout()
     filename = out_dir / f'pareto_{lang}.png'
-    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
+    fig.savefig(filename, dpi=dpi)
     print(f"saved {filename}")
-    plt.close()
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -9,7 +9,19 @@ import argparse
 import glob
 import json
 import os
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
+
+try:
+  import orjson
+except ImportError:  # pragma: no cover
+  orjson = None
+
+try:
+  import ijson
+except ImportError:  # pragma: no cover
+  ijson = None
 
 
 DEFAULT_QUESTIONS = {167, 828, 869}
@@ -38,42 +50,59 @@ def build_argparser() -> argparse.ArgumentParser:
   return parser
 
 
+def key_func(match: str) -> Callable[[int, dict[str, Any]], int]:
+  """Return the (index, item) -> question id function for a match mode, chosen once per run."""
+  if match == "index":
+    return lambda idx, item: idx
+  return lambda idx, item: int(item.get("question_num", idx))
+
+
+def count_matches(path: Path, questions: frozenset[int], getkey: Callable[[int, dict[str, Any]], int]) -> int | None:
+  """Count items that would be removed, streaming the file when ijson is available.
+
+  Returns None for empty files and files that do not hold a JSON list.
+  """
+  with path.open("rb") as f:
+    head = f.read(1)
+    while head.isspace():
+      head = f.read(1)
+    if head != b"[":
+      return None
+    f.seek(0)
+    items = ijson.items(f, "item", use_float=True) if ijson is not None else json.load(f)
+    return sum(1 for idx, item in enumerate(items) if getkey(idx, item) in questions)
+
+
 def main() -> int:
   args = build_argparser().parse_args()
-  questions = {int(x.strip()) for x in str(args.questions).split(",") if x.strip()}
+  questions = frozenset(int(x.strip()) for x in str(args.questions).split(",") if x.strip())
+  getkey = key_func(args.match)
   targets = [Path(p) for p in sorted(glob.glob(args.files_glob))]
   if not targets:
     raise SystemExit(f"no files matched: {args.files_glob}")
 
   for path in targets:
     print(path)
-    raw_text = path.read_text(encoding="utf-8")
-    if not raw_text.strip():
+    if args.dry_run:
+      removed = count_matches(path, questions, getkey)
+      if removed is not None:
+        print(f"dry-run: would remove {removed} items from {path}")
+      continue
+
+    raw = path.read_bytes()
+    if not raw.strip():
       continue
-    data = json.loads(raw_text)
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     if not isinstance(data, list):
       continue
 
-    out = []
-    removed = 0
-    for idx, item in enumerate(data):
-      if args.match == "index":
-        key = idx
-      elif args.match == "question_num":
-        key = int(item.get("question_num", idx))
-      else:
-        key = int(item.get("question_num", idx))
-
-      if key in questions:
-        removed += 1
-        continue
-      out.append(item)
-
-    if args.dry_run:
-      print(f"dry-run: would remove {removed} items from {path}")
-      continue
+    out = [item for idx, item in enumerate(data) if getkey(idx, item) not in questions]
+    removed = len(data) - len(out)
 
-    path.write_text(json.dumps(out, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if orjson is not None:
+      path.write_bytes(orjson.dumps(out, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    else:
+      path.write_text(json.dumps(out, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     print(f"finished removing {removed} questions for {path}")
 
   return 0
@@ -33,11 +33,14 @@ def main() -> int:
   if not results_dir.exists():
     raise SystemExit(f"results dir not found: {results_dir}")
 
-  renamed = 0
-  for name in os.listdir(results_dir):
-    if args.contains and args.contains not in name:
-      continue
+  # Snapshot the listing first: renaming while the scandir iterator is open could yield
+  # an already-renamed entry again and rename it a second time.
+  with os.scandir(results_dir) as it:
+    entries = [entry for entry in it if not args.contains or args.contains in entry.name]
 
+  renamed = 0
+  for entry in entries:
+    name = entry.name
     index = name.rfind("-")
     if index == -1:
       continue
@@ -46,17 +49,16 @@ def main() -> int:
     if new_name == name:
       continue
 
-    src_path = results_dir / name
-    dest_path = results_dir / new_name
-    if dest_path.exists():
+    dest_path = os.path.join(results_dir, new_name)
+    if os.path.exists(dest_path):
       print(f"skip (dest exists): {dest_path}")
       continue
 
     if args.dry_run:
-      print(f"would rename: {src_path.name} -> {dest_path.name}")
+      print(f"would rename: {name} -> {new_name}")
     else:
-      src_path.rename(dest_path)
-      print(f"renamed: {src_path.name} -> {dest_path.name}")
+      os.rename(entry.path, dest_path)
+      print(f"renamed: {name} -> {new_name}")
     renamed += 1
 
   print(f"done: renamed {renamed} files")